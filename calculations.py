@@ -15,18 +15,25 @@ This file is Copyright (c) 2021 Richard Shi.
 """
 import math
 from typing import Union
-from load_data import YearlyMetrics, MonthlyMetrics
+import numpy as np
+from load_data import YearlyMetrics, MonthlyMetrics, BASELINE_TEMP, get_column, \
+    get_date_labels
 
 # Initial values that can be used for year, co2, and temp when extrapolating data
 INITIAL_YEAR = 2020
 INITIAL_CO2 = 414.24
 INITIAL_TEMP = 15.49
 
+# The increase in CO2 concentration (in ppm) per gigaton of carbon emitted: 45% of the emissions
+# stay in the atmosphere and every 2.3 GtC raises the concentration by 1 ppm
+CO2_INCREASE_FACTOR = 0.45 / 2.3
+
 
 ####################################################################################################
 # Functions for performing computations on the data
 ####################################################################################################
-def calculate_concentration(past_concentration: float, emissions: float) -> float:
+def calculate_concentration(past_concentration: Union[float, np.ndarray],
+                            emissions: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
     """Return the estimated CO2 concentration.
 
     The CO2 concentration (in ppm) is calculated by taking 45% of the amount of CO2 emissions
@@ -34,6 +41,9 @@ def calculate_concentration(past_concentration: float, emissions: float) -> floa
     estimated CO2 concentration for the next year is calculated by adding the increase with the
     previous year's concentration.
 
+    Since this only uses arithmetic operators, <past_concentration> and <emissions> can also be
+    NumPy arrays, in which case an array of estimated concentrations is returned.
+
     Preconditions:
         - past_concentration >= 0.0
         - emissions >= 0.0
@@ -41,8 +51,11 @@ def calculate_concentration(past_concentration: float, emissions: float) -> floa
     >>> new_concentration = calculate_concentration(414.24, 10.0)
     >>> round(new_concentration, 2) == 416.20
     True
+    >>> new_concentrations = calculate_concentration(414.24, np.array([0.0, 10.0]))
+    >>> np.round(new_concentrations, 2).tolist() == [414.24, 416.20]
+    True
     """
-    increase_in_concentration = (emissions * 0.45) / 2.3
+    increase_in_concentration = emissions * CO2_INCREASE_FACTOR
     estimated_concentration = past_concentration + increase_in_concentration
 
     return estimated_concentration
@@ -69,53 +82,64 @@ def calculate_temperature(current_temp: float, sensitivity: float, new_concentra
     True
     """
     calculated_temp = current_temp + \
-        sensitivity * math.log(new_concentration / current_concentration, 2)
-    calculated_temp_anomaly = calculated_temp - 13.9
+        sensitivity * math.log2(new_concentration / current_concentration)
+    calculated_temp_anomaly = calculated_temp - BASELINE_TEMP
 
     return calculated_temp, calculated_temp_anomaly
 
 
-def update_data(metrics: list[Union[YearlyMetrics, MonthlyMetrics]],
+def update_data(metrics: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray],
                 sensitivity: float) -> None:
-    """Mutate the input list <metrics> of YearlyMetrics or MonthlyMetrics objects. <metrics> should
-    be the returned list from either the load_data.load_yearly_data or load_data.load_monthly_data
-    function.
+    """Mutate the input <metrics>, which is either a list of YearlyMetrics or MonthlyMetrics
+    objects or a structured array. <metrics> should be the returned value from one of the
+    load_data.load_yearly_data, load_data.load_monthly_data, load_data.load_yearly_data_np, or
+    load_data.load_monthly_data_np functions.
 
-    This mutation will update the calculated_temp and calculated_temp_anomaly attributes of each
-    object (except the first).
+    This mutation will update the calculated_temp and calculated_temp_anomaly attributes (or fields,
+    for a structured array) of each entry (except the first).
 
     Preconditions:
-        - metrics is the returned list of load_data.load_yearly_data or load_data.load_monthly_data
+        - metrics is the returned value of one of the load_data loading functions
         - 2.0 <= sensitivity <= 5.0
     """
-    # Initial values taken from the first YearlyMetrics/MonthlyMetrics object
-    past_co2 = metrics[0].co2
-    past_temp = metrics[0].temp
+    co2, temp = _to_arrays(metrics)
 
     # Since the first row acts as initial values, we'll only need to update the objects beyond the
-    # first index
-    for i in range(1, len(metrics)):
-        current_entry = metrics[i]
-        current_co2 = current_entry.co2
-
-        current_temp, current_temp_anomaly = calculate_temperature(current_temp=past_temp,
-                                                                   sensitivity=sensitivity,
-                                                                   new_concentration=current_co2,
-                                                                   current_concentration=past_co2
-                                                                   )
-        current_entry.calculated_temp = current_temp
-        current_entry.calculated_temp_anomaly = current_temp_anomaly
-
-        past_co2 = current_co2
-        past_temp = current_entry.temp
+    # first index. Each entry uses the CO2 concentration and temperature of the entry before it.
+    calculated_temps = temp[:-1] + sensitivity * np.log2(co2[1:] / co2[:-1])
+    calculated_temp_anomalies = calculated_temps - BASELINE_TEMP
+
+    if isinstance(metrics, np.ndarray):
+        metrics['calculated_temp'][1:] = calculated_temps
+        metrics['calculated_temp_anomaly'][1:] = calculated_temp_anomalies
+    else:
+        for entry, current_temp, current_temp_anomaly in zip(metrics[1:], calculated_temps,
+                                                             calculated_temp_anomalies):
+            entry.calculated_temp = float(current_temp)
+            entry.calculated_temp_anomaly = float(current_temp_anomaly)
+
+
+def _to_arrays(metrics: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray]) \
+        -> tuple[np.ndarray, np.ndarray]:
+    """Return a tuple of two parallel arrays containing the co2 and temp attributes of each entry
+    in <metrics>. If <metrics> is a structured array, its co2 and temp fields are returned directly.
+
+    >>> co2, temp = _to_arrays([YearlyMetrics(1959, 315.98, temp=13.98),
+    ...                         YearlyMetrics(1960, 316.91, temp=13.94)])
+    >>> co2.tolist() == [315.98, 316.91]
+    True
+    >>> temp.tolist() == [13.98, 13.94]
+    True
+    """
+    return get_column(metrics, 'co2'), get_column(metrics, 'temp')
 
 
 def extrapolate_data(num_entries: int, sensitivity: float, emissions: float) -> list[YearlyMetrics]:
     """Return a list of <num_entries> YearlyMetric objects that represent the extrapolated data.
 
-    The variables <sensitivity> and <emissions> will be used in the calculate_temperature and
-    calculate_concentration functions, respectively, to calculate the temperature and temperature
-    anomalies for a given year.
+    The variables <sensitivity> and <emissions> will be used in the formulas from the
+    calculate_temperature and calculate_concentration functions, respectively, to calculate the
+    temperature and temperature anomalies for a given year.
 
     For the sake of convenience in our visualization part, we will be storing the calculated values
     in the temp and temp_anomaly instance attributes of YearlyMetrics and MonthlyMetrics instead.
@@ -136,93 +160,134 @@ def extrapolate_data(num_entries: int, sensitivity: float, emissions: float) ->
     >>> all(entry.temp_anomaly is not None for entry in new_data)
     True
     """
-    metrics_so_far = []
+    years, co2, temps = _extrapolate_core(num_entries, sensitivity, emissions)
 
-    # Initial values
-    past_co2 = INITIAL_CO2
-    past_temp = INITIAL_TEMP
+    temp_anomalies = temps - BASELINE_TEMP
 
-    for i in range(1, num_entries + 1):
-        current_year = 2020 + i
-        current_co2 = calculate_concentration(past_concentration=past_co2, emissions=emissions)
-        current_temp, current_temp_anomaly = calculate_temperature(current_temp=past_temp,
-                                                                   sensitivity=sensitivity,
-                                                                   new_concentration=current_co2,
-                                                                   current_concentration=past_co2
-                                                                   )
+    # Converting each array with tolist() creates all the Python ints and floats in bulk instead of
+    # indexing the arrays one NumPy scalar at a time
+    return [YearlyMetrics(year=year,
+                          co2=current_co2,
+                          temp=current_temp,
+                          temp_anomaly=current_temp_anomaly
+                          )
+            for year, current_co2, current_temp, current_temp_anomaly
+            in zip(years.tolist(), co2.tolist(), temps.tolist(), temp_anomalies.tolist())]
 
-        metrics_so_far.append(YearlyMetrics(year=current_year,
-                                            co2=current_co2,
-                                            temp=current_temp,
-                                            temp_anomaly=current_temp_anomaly
-                                            )
-                              )
 
-        past_co2 = current_co2
-        past_temp = current_temp
+def _extrapolate_core(num_entries: int, sensitivity: float, emissions: float) \
+        -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return a tuple of three parallel arrays containing the years, CO2 concentrations, and
+    temperatures of <num_entries> years of extrapolated data, starting after INITIAL_YEAR from
+    INITIAL_CO2 and INITIAL_TEMP.
 
-    return metrics_so_far
+    Applying calculate_concentration year after year adds the same increase every year, so the
+    concentration after i years is INITIAL_CO2 plus i times that increase. The log terms of
+    calculate_temperature also cancel out year after year, so the temperature after i years only
+    depends on the concentration after i years and INITIAL_CO2. Both can be computed for all
+    years at once instead of one year at a time.
+
+    Preconditions:
+        - num_entries > 0
+        - 2.0 <= sensitivity <= 5.0
+        - emissions >= 0.0
+
+    >>> years, co2, temps = _extrapolate_core(5, 3.0, 10.0)
+    >>> years.tolist() == [2021, 2022, 2023, 2024, 2025]
+    True
+    >>> # Verifying the result against applying the formulas one year at a time
+    >>> current_co2, current_temp, expected_co2, expected_temps = INITIAL_CO2, INITIAL_TEMP, [], []
+    >>> for _ in range(5):
+    ...     new_co2 = calculate_concentration(current_co2, 10.0)
+    ...     current_temp, _ = calculate_temperature(current_temp, 3.0, new_co2, current_co2)
+    ...     current_co2 = new_co2
+    ...     expected_co2.append(current_co2)
+    ...     expected_temps.append(current_temp)
+    >>> all(math.isclose(actual, expected) for actual, expected in zip(co2.tolist(), expected_co2))
+    True
+    >>> all(math.isclose(actual, expected) for actual, expected in zip(temps.tolist(),
+    ...                                                                  expected_temps))
+    True
+    """
+    years = np.arange(INITIAL_YEAR + 1, INITIAL_YEAR + num_entries + 1)
+    # The concentration after i years is the same as emitting i years of emissions at once
+    co2 = calculate_concentration(INITIAL_CO2, emissions * np.arange(1, num_entries + 1))
+    temps = INITIAL_TEMP + sensitivity * np.log2(co2 / INITIAL_CO2)
+
+    return years, co2, temps
 
 
 ####################################################################################################
 # Functions for reporting statistics
 ####################################################################################################
-def calculate_error(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) -> dict[str, float]:
+def calculate_error(metrics: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray]) \
+        -> dict[str, float]:
     """Return a list of tuples containing the year (and month, if <metrics> is a list of
     MonthlyMetrics objects) and the percentage error of the recorded and accepted values for the
     temperature anomalies.
 
     Preconditions:
-        - metrics is the mutated list after being passed to update_data
+        - metrics is the mutated list or structured array after being passed to update_data
     """
-    percent_errors_so_far = {}
-
-    for entry in metrics[1:]:
-        if isinstance(entry, YearlyMetrics):
-            current_year = str(entry.year)
-        else:
-            current_year = f'{entry.year}, {entry.month}'
+    return dict(zip(get_date_labels(metrics[1:]), _errors_array(metrics).tolist()))
 
-        calculated_value = entry.calculated_temp_anomaly
-        known_value = entry.temp_anomaly
 
-        # Since the known value could be 0, we will calculate percent error by taking the natural
-        # log of e to the power of the calculated minus the known value and then multiplying it by
-        # 100
-        percent_error = abs(math.log(math.exp(calculated_value - known_value))) * 100
+def calculate_average_percent_error(metrics: Union[list[Union[YearlyMetrics, MonthlyMetrics]],
+                                                    np.ndarray]) -> str:
+    """Return the average percent error of the recorded and accepted values for the temperature
+    anomalies.
 
-        percent_errors_so_far[current_year] = percent_error
+    Preconditions:
+        - metrics is the mutated list or structured array after being passed to update_data
+    """
+    output = f'{round(float(_errors_array(metrics).mean()), 2)}%'
 
-    return percent_errors_so_far
+    return output
 
 
-def calculate_average_percent_error(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) -> str:
-    """Return the average percent error of the recorded and accepted values for the temperature
-    anomalies.
+def _errors_array(metrics: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray]) \
+        -> np.ndarray:
+    """Return an array of the percentage errors of the recorded and accepted values for the
+    temperature anomalies of every entry in <metrics> (except the first).
 
     Preconditions:
-        - metrics is the mutated list after being passed to update_data
+        - metrics is the mutated list or structured array after being passed to update_data
+
+    >>> data = [YearlyMetrics(1959, 315.98), YearlyMetrics(1960, 316.91, temp_anomaly=0.05,
+    ...                                                    calculated_temp_anomaly=0.08)]
+    >>> [round(error, 2) for error in _errors_array(data).tolist()]
+    [3.0]
     """
-    error_data = calculate_error(metrics)
-    error_values = list(error_data.values())
-    output = f'{round(sum(error_values) / len(error_values), 2)}%'
+    calculated_values = get_column(metrics[1:], 'calculated_temp_anomaly')
+    known_values = get_column(metrics[1:], 'temp_anomaly')
 
-    return output
+    # Since the known value could be 0, we will calculate percent error by taking the absolute
+    # difference of the calculated and known values and then multiplying it by 100 (this is
+    # the same as the natural log of e to the power of the difference, without the overflow)
+    return np.abs(calculated_values - known_values) * 100
 
 
 if __name__ == '__main__':
+    import os
+    import sys
     import doctest
-    doctest.testmod(verbose=True)
-
-    import python_ta
-    import python_ta.contracts
-
-    python_ta.contracts.DEBUG_CONTRACTS = False
-    python_ta.contracts.check_all_contracts()
 
-    python_ta.check_all(config={
-        'extra-imports': ['math', 'load_data', 'Union'],
-        'allowed-io': [],
-        'max-line-length': 100,
-        'disable': ['R1705', 'C0200']
-    })
+    # Running with python -O skips the doctests
+    if not sys.flags.optimize:
+        doctest.testmod(verbose=True)
+
+    # python_ta is slow to import and check, so it only runs when the RUN_PYTA environment
+    # variable is set
+    if os.environ.get('RUN_PYTA'):
+        import python_ta
+        import python_ta.contracts
+
+        python_ta.contracts.DEBUG_CONTRACTS = False
+        python_ta.contracts.check_all_contracts()
+
+        python_ta.check_all(config={
+            'extra-imports': ['sys', 'os', 'math', 'load_data', 'Union', 'numpy'],
+            'allowed-io': [],
+            'max-line-length': 100,
+            'disable': ['R1705', 'C0200']
+        })
@@ -4,7 +4,8 @@ Module Description
 ==================
 
 This module contains dataclasses and functions for loading and cleaning the climate data from the
-csv files. There are two dataclasses which store yearly and monthly climate data.
+csv files. There are two dataclasses which store yearly and monthly climate data. The same data can
+also be loaded as NumPy structured arrays, which is the faster option for vectorized calculations.
 
 The data sets being used include:
 
@@ -20,21 +21,33 @@ with any changes, are expressly prohibited.
 
 This file is Copyright (c) 2021 Richard Shi.
 """
+import math
 import os
 from dataclasses import dataclass
-from typing import Optional
-import csv
-
-# Constants for the csv file locations
-ANNUAL_CO2_FILE = os.path.dirname(os.path.realpath(__file__)) + '\\co2_annmean_mlo.csv'
-ANNUAL_TEMP_ANOMALY_FILE = os.path.dirname(os.path.realpath(__file__)) + '\\annual_temp_' \
-                                                                         'anomalies.csv'
-MONTHLY_CO2_FILE = os.path.dirname(os.path.realpath(__file__)) + '\\co2_mm_mlo.csv'
-MONTHLY_TEMP_ANOMALY_FILE = os.path.dirname(os.path.realpath(__file__)) + '\\monthly_temp_' \
-                                                                          'anomalies.csv'
+from typing import Optional, Union
+import numpy as np
 
+# The 20th century average global temperature in degrees Celsius, which temperature anomalies are
+# measured against
+BASELINE_TEMP = 13.9
 
-@dataclass
+# Constants for the csv file locations
+_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+ANNUAL_CO2_FILE = os.path.join(_DIRECTORY, 'co2_annmean_mlo.csv')
+ANNUAL_TEMP_ANOMALY_FILE = os.path.join(_DIRECTORY, 'annual_temp_anomalies.csv')
+MONTHLY_CO2_FILE = os.path.join(_DIRECTORY, 'co2_mm_mlo.csv')
+MONTHLY_TEMP_ANOMALY_FILE = os.path.join(_DIRECTORY, 'monthly_temp_anomalies.csv')
+
+# The structured array layouts used by load_yearly_data_np and load_monthly_data_np. Any attribute
+# that would be None in a YearlyMetrics or MonthlyMetrics object is stored as NaN instead.
+YEARLY_DTYPE = np.dtype([('year', 'i4'), ('co2', 'f8'), ('temp_anomaly', 'f8'), ('temp', 'f8'),
+                         ('calculated_temp', 'f8'), ('calculated_temp_anomaly', 'f8')])
+MONTHLY_DTYPE = np.dtype([('year', 'i4'), ('month', 'i1'), ('co2', 'f8'), ('temp_anomaly', 'f8'),
+                          ('temp', 'f8'), ('calculated_temp', 'f8'),
+                          ('calculated_temp_anomaly', 'f8')])
+
+
+@dataclass(slots=True)
 class YearlyMetrics:
     """A bundle of yearly climate data that was measured by NOAA and our own calculated climate
     data.
@@ -74,7 +87,7 @@ class YearlyMetrics:
     calculated_temp_anomaly: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MonthlyMetrics:
     """A bundle of monthly climate data that was measured by NOAA and our own calculated climate
     data.
@@ -134,49 +147,11 @@ def load_yearly_data(filename1: str, filename2: str) -> list[YearlyMetrics]:
     >>> data[61].year == 2020  # Verifying the last YearlyMetrics object is data from 2020
     True
     """
-    # ACCUMULATOR metrics_so_far: The YearlyMetrics parsed from the data sets so far
-    metrics_so_far = []
-
-    with open(filename1) as f:
-        reader = csv.reader(f, delimiter=',')
-        # Skipping unnecessary lines
-        for _ in range(56):
-            next(reader)
-
-        for row in reader:
-            assert len(row) == 3, 'Expected each row to contain 3 elements.'
-            year = int(row[0])
-            if 1959 <= year <= 2020:
-                co2 = float(row[1])
-                # First, instantiate a YearlyMetrics object with the data from the current data set
-                # and we will mutate it to fill in missing data once we parse the other data set.
-                metrics_so_far.append(YearlyMetrics(year=year,
-                                                    co2=co2
-                                                    )
-                                      )
-
-    with open(filename2) as f:
-        reader = csv.reader(f, delimiter=',')
-        # Skipping unnecessary lines
-        for _ in range(5):
-            next(reader)
-        # Add a variable to keep track of the current index to know which YearlyMetrics object to
-        # mutate in the list.
-        index = 0
-
-        for row in reader:
-            assert len(row) == 2, 'Expected each row to contain 2 elements.'
-            year = int(row[0])
-            if 1959 <= year <= 2020:
-                temp_anomaly = float(row[1])
-                temp = round(13.9 + temp_anomaly, 2)
-
-                # Mutate the corresponding YearlyMetrics object to fill in the missing data.
-                metrics_so_far[index].temp_anomaly = temp_anomaly
-                metrics_so_far[index].temp = temp
-                index += 1
-
-    return metrics_so_far
+    data = load_yearly_data_np(filename1, filename2)
+
+    return [YearlyMetrics(year=year, co2=co2, temp_anomaly=_nan_to_none(temp_anomaly),
+                          temp=_nan_to_none(temp))
+            for year, co2, temp_anomaly, temp, _, _ in data.tolist()]
 
 
 def load_monthly_data(filename1: str, filename2: str) -> list[MonthlyMetrics]:
@@ -196,68 +171,201 @@ def load_monthly_data(filename1: str, filename2: str) -> list[MonthlyMetrics]:
     >>> data[743].year == 2020 and data[743].month == 12  # Verifying data
     True
     """
-    # ACCUMULATOR metrics_so_far: The MonthlyMetrics parsed from the data sets so far.
-    metrics_so_far = []
-
-    with open(filename1) as f:
-        reader = csv.reader(f, delimiter=',')
-        # Skipping unnecessary lines
-        for _ in range(52):
-            next(reader)
-
-        for row in reader:
-            assert len(row) == 8, 'Expected each row to contain 8 elements.'
-            year = int(row[0])
-            if 1959 <= year <= 2020:
-                month = int(row[1])
-                co2 = float(row[3])
-                # First, instantiate a MonthlyMetrics object with the data from the current data set
-                # and we will mutate it to fill in missing data once we parse the other data set.
-                metrics_so_far.append(MonthlyMetrics(year=year,
-                                                     month=month,
-                                                     co2=co2
-                                                     )
-                                      )
-
-    with open(filename2) as f:
-        reader = csv.reader(f, delimiter=',')
-        # Skipping unnecessary lines
-        for _ in range(5):
-            next(reader)
-        # Add a variable to keep track of the current index to know which MonthlyMetrics object to
-        # mutate in the list.
-        index = 0
-
-        for row in reader:
-            assert len(row) == 2, 'Expected each row to contain 2 elements.'
-            year = int(row[0][:4])
-            if 1959 <= year <= 2020:
-                month = int(row[0][4:])
-                temp_anomaly = float(row[1])
-                temp = round(13.9 + temp_anomaly, 2)
-
-                # Mutate the corresponding YearlyMetrics object to fill in the missing data.
-                metrics_so_far[index].month = month
-                metrics_so_far[index].temp_anomaly = temp_anomaly
-                metrics_so_far[index].temp = temp
-                index += 1
-
-    return metrics_so_far
+    data = load_monthly_data_np(filename1, filename2)
 
+    return [MonthlyMetrics(year=year, month=month, co2=co2,
+                           temp_anomaly=_nan_to_none(temp_anomaly), temp=_nan_to_none(temp))
+            for year, month, co2, temp_anomaly, temp, _, _ in data.tolist()]
 
-if __name__ == '__main__':
-    import doctest
-    doctest.testmod(verbose=True)
 
-    import python_ta
-    import python_ta.contracts
+def load_yearly_data_np(filename1: str, filename2: str) -> np.ndarray:
+    """Return the same climate data as load_yearly_data, but as a structured array with the
+    YEARLY_DTYPE layout.
+
+    The columns are filled in directly from the parsed csv files, without creating any
+    YearlyMetrics objects.
+
+    >>> data = load_yearly_data_np(ANNUAL_CO2_FILE, ANNUAL_TEMP_ANOMALY_FILE)
+    >>> len(data) == 62
+    True
+    >>> data['year'][[0, 61]].tolist() == [1959, 2020]  # Verifying data
+    True
+    """
+    # Skipping unnecessary lines and only keeping the years from 1959 to 2020
+    co2_data = _load_csv_file(filename1, 56, 3)
+    co2_data = co2_data[(co2_data[:, 0] >= 1959) & (co2_data[:, 0] <= 2020)]
+    anomaly_data = _load_csv_file(filename2, 5, 2)
+
+    data = np.empty(len(co2_data), dtype=YEARLY_DTYPE)
+    data['year'] = co2_data[:, 0]
+    data['co2'] = co2_data[:, 1]
+
+    _fill_temps(data, data['year'], anomaly_data)
+
+    return data
+
+
+def load_monthly_data_np(filename1: str, filename2: str) -> np.ndarray:
+    """Return the same climate data as load_monthly_data, but as a structured array with the
+    MONTHLY_DTYPE layout.
+
+    The columns are filled in directly from the parsed csv files, without creating any
+    MonthlyMetrics objects.
+
+    >>> data = load_monthly_data_np(MONTHLY_CO2_FILE, MONTHLY_TEMP_ANOMALY_FILE)
+    >>> len(data) == 744
+    True
+    >>> data[743].tolist()[:2] == (2020, 12)  # Verifying data
+    True
+    """
+    # Skipping unnecessary lines and only keeping the years from 1959 to 2020
+    co2_data = _load_csv_file(filename1, 52, 8)
+    co2_data = co2_data[(co2_data[:, 0] >= 1959) & (co2_data[:, 0] <= 2020)]
+    anomaly_data = _load_csv_file(filename2, 5, 2)
+
+    data = np.empty(len(co2_data), dtype=MONTHLY_DTYPE)
+    data['year'] = co2_data[:, 0]
+    data['month'] = co2_data[:, 1]
+    data['co2'] = co2_data[:, 3]
+
+    # The anomaly dates are in the form YYYYMM, so the CO2 dates are converted to the same form
+    _fill_temps(data, data['year'] * 100 + data['month'], anomaly_data)
+
+    return data
+
+
+def _fill_temps(data: np.ndarray, dates: np.ndarray, anomaly_data: np.ndarray) -> None:
+    """Fill in the temp_anomaly and temp columns of the structured array <data> from the rows of
+    <anomaly_data>, and set the calculated columns to NaN.
+
+    Each row of <anomaly_data> contains a date and a temperature anomaly, and is matched to the
+    entry of <data> with the same date in <dates>. Entries without a matching row are set to NaN.
+
+    Preconditions:
+        - len(dates) == len(data)
+    """
+    data['temp_anomaly'] = np.nan
+    data['temp'] = np.nan
+    data['calculated_temp'] = np.nan
+    data['calculated_temp_anomaly'] = np.nan
+
+    # Map each date to its index in data so the rows of the two data sets are matched by date
+    # rather than by their position in the files. Rows outside of data's dates map to -1.
+    index_of_date = {date: index for index, date in enumerate(dates.tolist())}
+    indices = np.array([index_of_date.get(date, -1)
+                        for date in anomaly_data[:, 0].astype(int).tolist()], dtype=np.intp)
+    found = indices >= 0
+
+    data['temp_anomaly'][indices[found]] = anomaly_data[found, 1]
+    data['temp'][indices[found]] = np.round(BASELINE_TEMP + anomaly_data[found, 1], 2)
 
-    python_ta.contracts.DEBUG_CONTRACTS = False
-    python_ta.contracts.check_all_contracts()
 
-    python_ta.check_all(config={
-        'extra-imports': ['dataclass', 'csv', 'Optional', 'os'],
-        'allowed-io': ['load_yearly_data', 'load_monthly_data'],
-        'max-line-length': 100,
-        'disable': ['R1705', 'C0200']
-    })
+def _load_csv_file(filename: str, skiprows: int, num_columns: int) -> np.ndarray:
+    """Return a 2D array containing the rows of <filename> after skipping its first <skiprows>
+    lines.
+
+    Preconditions:
+        - Every row of <filename> after the skipped lines contains <num_columns> numbers.
+    """
+    data = np.loadtxt(filename, delimiter=',', skiprows=skiprows, ndmin=2)
+
+    # np.loadtxt already rejects rows of different lengths, but not a file with the wrong format
+    assert data.shape[1] == num_columns, f'Expected each row to contain {num_columns} elements.'
+
+    return data
+
+
+def _nan_to_none(value: float) -> Optional[float]:
+    """Return None if <value> is NaN, and <value> otherwise.
+
+    >>> _nan_to_none(float('nan')) is None
+    True
+    >>> _nan_to_none(1.5)
+    1.5
+    """
+    return None if math.isnan(value) else value
+
+
+def get_column(data: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray],
+               name: str) -> np.ndarray:
+    """Return an array containing the <name> attribute of each entry in <data>, with any None
+    attribute stored as NaN. If <data> is a structured array, its <name> field is returned
+    directly.
+
+    >>> get_column([YearlyMetrics(1959, 315.98), YearlyMetrics(1960, 316.91)], 'co2').tolist()
+    [315.98, 316.91]
+    >>> get_column([YearlyMetrics(1959, 315.98)], 'calculated_temp').tolist()
+    [nan]
+    """
+    if isinstance(data, np.ndarray):
+        return data[name]
+
+    return np.fromiter((getattr(entry, name) for entry in data), dtype=np.float64,
+                       count=len(data))
+
+
+def is_monthly_data(data: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray]) -> bool:
+    """Return whether <data>, which is either a list of YearlyMetrics or MonthlyMetrics objects or a
+    structured array, contains monthly data rather than yearly data.
+
+    >>> is_monthly_data(np.zeros(1, dtype=MONTHLY_DTYPE))
+    True
+    >>> is_monthly_data([YearlyMetrics(1959, 315.98)])
+    False
+    """
+    if isinstance(data, np.ndarray):
+        return 'month' in data.dtype.names
+
+    # Every entry in data has the same type, so only the first one needs to be checked
+    return data != [] and isinstance(data[0], MonthlyMetrics)
+
+
+def get_date_labels(data: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray]) \
+        -> list[str]:
+    """Return a list of the dates of the entries in <data>, which is either a list of YearlyMetrics
+    or MonthlyMetrics objects or a structured array, in the form 'year' for yearly data or
+    'year, month' for monthly data.
+
+    >>> data = np.zeros(2, dtype=MONTHLY_DTYPE)
+    >>> data['year'], data['month'] = 1959, [1, 2]
+    >>> get_date_labels(data)
+    ['1959, 1', '1959, 2']
+    >>> get_date_labels([YearlyMetrics(1959, 315.98), YearlyMetrics(1960, 316.91)])
+    ['1959', '1960']
+    """
+    if isinstance(data, np.ndarray):
+        dates = data['year'].astype(str)
+
+        if is_monthly_data(data):
+            dates = np.char.add(np.char.add(dates, ', '), data['month'].astype(str))
+
+        return dates.tolist()
+    elif is_monthly_data(data):
+        return [f'{entry.year}, {entry.month}' for entry in data]
+    else:
+        return [str(entry.year) for entry in data]
+
+
+if __name__ == '__main__':
+    import sys
+    import doctest
+
+    # Running with python -O skips the doctests
+    if not sys.flags.optimize:
+        doctest.testmod(verbose=True)
+
+    # python_ta is slow to import and check, so it only runs when the RUN_PYTA environment
+    # variable is set
+    if os.environ.get('RUN_PYTA'):
+        import python_ta
+        import python_ta.contracts
+
+        python_ta.contracts.DEBUG_CONTRACTS = False
+        python_ta.contracts.check_all_contracts()
+
+        python_ta.check_all(config={
+            'extra-imports': ['sys', 'dataclass', 'Optional', 'Union', 'math', 'os', 'numpy'],
+            'allowed-io': ['load_yearly_data', 'load_monthly_data'],
+            'max-line-length': 100,
+            'disable': ['R1705', 'C0200']
+        })
@@ -14,9 +14,11 @@ with any changes, are expressly prohibited.
 
 This file is Copyright (c) 2021 Richard Shi.
 """
+import gc
 import tkinter as tk
-from typing import Union
-import os
+from functools import lru_cache
+from typing import NamedTuple, Union
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from load_data import YearlyMetrics, MonthlyMetrics
@@ -24,13 +26,34 @@ from load_data import YearlyMetrics, MonthlyMetrics
 import load_data as load
 import calculations as calc
 
-# Constants for the csv file locations
-ANNUAL_CO2_FILE = os.path.dirname(os.path.realpath(__file__)) + '\\co2_annmean_mlo.csv'
-ANNUAL_TEMP_ANOMALY_FILE = os.path.dirname(os.path.realpath(__file__)) + '\\annual_temp_' \
-                                                                         'anomalies.csv'
-MONTHLY_CO2_FILE = os.path.dirname(os.path.realpath(__file__)) + '\\co2_mm_mlo.csv'
-MONTHLY_TEMP_ANOMALY_FILE = os.path.dirname(os.path.realpath(__file__)) + '\\monthly_temp_' \
-                                                                          'anomalies.csv'
+# Constants for the csv file locations, which load_data has already resolved
+ANNUAL_CO2_FILE = load.ANNUAL_CO2_FILE
+ANNUAL_TEMP_ANOMALY_FILE = load.ANNUAL_TEMP_ANOMALY_FILE
+MONTHLY_CO2_FILE = load.MONTHLY_CO2_FILE
+MONTHLY_TEMP_ANOMALY_FILE = load.MONTHLY_TEMP_ANOMALY_FILE
+
+
+class Specifications(NamedTuple):
+    """The user's specifications detailing what type of climate data should be visualized and how.
+
+    Instance Attributes:
+        - is_extrapolate: Whether the climate data should be extrapolated rather than recorded.
+        - is_yearly_data: Whether yearly (rather than monthly) recorded data should be visualized.
+        - sensitivity: The climate sensitivity factor.
+        - num_entries: The number of years of data to extrapolate. Only used when is_extrapolate is
+        True.
+        - emissions: The gigatons of carbon emitted annually. Only used when is_extrapolate is True.
+
+    Representation Invariants:
+        - 2.0 <= self.sensitivity <= 5.0
+        - not self.is_extrapolate or self.num_entries > 0
+        - self.emissions >= 0.0
+    """
+    is_extrapolate: bool
+    is_yearly_data: bool
+    sensitivity: float
+    num_entries: int = 0
+    emissions: float = 0.0
 
 
 def run_visualization() -> None:
@@ -74,43 +97,48 @@ def run_visualization() -> None:
                                                                extrapolate_button
                                                                )
                                    )
+
+    def get_current_specifications() -> Specifications:
+        """Return the specifications currently selected in the window, only reading the widgets
+        that are used by the current mode.
+        """
+        if extrapolate_button['text'] == 'On':
+            return get_extrapolated_specifications(sensitivity_slider, extrapolate_input,
+                                                   extrapolate_emissions)
+        else:
+            return get_recorded_specifications(type_slider, sensitivity_slider)
+
     # Generate the graph widget
     visualize_button = tk.Button(frame, text='Click to visualize the data!',
                                  command=lambda:
-                                 visualize_button_callback(get_specifications(type_slider,
-                                                                              sensitivity_slider,
-                                                                              extrapolate_button,
-                                                                              extrapolate_input,
-                                                                              extrapolate_emissions
-                                                                              )
-                                                           )
+                                 visualize_button_callback(get_current_specifications())
                                  )
     # Reporting error widgets
     report_error_button = tk.Button(frame, text='Click to see the accuracy of the model!',
                                     command=lambda:
-                                    report_error_button_callback(
-                                        get_specifications(type_slider,
-                                                           sensitivity_slider,
-                                                           extrapolate_button,
-                                                           extrapolate_input,
-                                                           extrapolate_emissions
-                                                           )
-                                    )
+                                    report_error_button_callback(get_current_specifications())
                                     )
 
-    # Packing and organizing the widgets
-    type_label.pack(side=tk.TOP)
-    type_slider.pack(side=tk.TOP)
-    sensitivity_label.pack(side=tk.TOP, pady=(20, 0))
-    sensitivity_slider.pack(side=tk.TOP)
-    extrapolate_label.pack(side=tk.TOP, pady=(20, 0))  # The tuple indicates (top, bottom) padding
-    extrapolate_button.pack(side=tk.TOP)
-    visualize_button.pack(side=tk.BOTTOM, pady=(20, 0))
-    report_error_button.pack(side=tk.BOTTOM, pady=(20, 0))
-    extrapolate_input_q.pack_forget()  # Make these widgets invisible until needed
-    extrapolate_input.pack_forget()
-    extrapolate_emissions_q.pack_forget()
-    extrapolate_emissions.pack_forget()
+    # Organizing the widgets into a single column, one widget per row
+    type_label.grid(row=0, column=0)
+    type_slider.grid(row=1, column=0)
+    # The tuple indicates (top, bottom) padding
+    sensitivity_label.grid(row=2, column=0, pady=(20, 0))
+    sensitivity_slider.grid(row=3, column=0)
+    extrapolate_label.grid(row=4, column=0, pady=(20, 0))
+    extrapolate_button.grid(row=5, column=0)
+    extrapolate_input_q.grid(row=6, column=0, pady=(20, 0))
+    extrapolate_input.grid(row=7, column=0)
+    extrapolate_emissions_q.grid(row=8, column=0)
+    extrapolate_emissions.grid(row=9, column=0)
+    report_error_button.grid(row=10, column=0, pady=(20, 0))
+    visualize_button.grid(row=11, column=0, pady=(20, 0))
+    # Make these widgets invisible until needed. grid_remove remembers their row and padding, so
+    # they can be shown again with grid().
+    extrapolate_input_q.grid_remove()
+    extrapolate_input.grid_remove()
+    extrapolate_emissions_q.grid_remove()
+    extrapolate_emissions.grid_remove()
 
     window.mainloop()
 
@@ -123,108 +151,58 @@ def extrapolate_button_callback(label1: tk.Label, inp: tk.Scale, label2: tk.Labe
     """
     if button['text'] == 'Off':
         button.config(text='On', fg='green')
-        label1.pack(side=tk.TOP, pady=(20, 0))  # Make the widgets visible now
-        inp.pack(side=tk.TOP)
-        label2.pack(side=tk.TOP)
-        scale.pack(side=tk.TOP)
+        label1.grid()  # Make the widgets visible now, in the rows they were originally given
+        inp.grid()
+        label2.grid()
+        scale.grid()
     else:
         button.config(text='Off', fg='red')
-        label1.pack_forget()  # Hiding the widgets again
-        inp.pack_forget()
-        label2.pack_forget()
-        scale.pack_forget()
-
-    button.update()
+        label1.grid_remove()  # Hiding the widgets again
+        inp.grid_remove()
+        label2.grid_remove()
+        scale.grid_remove()
 
 
-def visualize_button_callback(specifications: tuple[str, list]) -> None:
+def visualize_button_callback(specifications: Specifications) -> None:
     """Visualize the climate data given the user's specifications.
 
-    The <specifications> list will either contain specifications for modelling recorded climate data
-    or for extrapolating climate data, depending on whether or not the str in the tuple is 'Off' or
-    'On,' respectively.
-
-    Preconditions:
-        - len(specifications) != 0
-        - specifications[1] != []
+    Depending on <specifications>, this will either model the recorded climate data or extrapolate
+    the climate data.
     """
-    is_extrapolate = True if specifications[0] == 'On' else False
-
-    if is_extrapolate:
-        num_entries, sensitivity, emissions = specifications[1]
-        climate_data = calc.extrapolate_data(num_entries, sensitivity, emissions)
+    if specifications.is_extrapolate:
+        climate_data = calc.extrapolate_data(specifications.num_entries,
+                                             specifications.sensitivity,
+                                             specifications.emissions)
     else:
-        is_yearly_data = specifications[1][0]
-        if is_yearly_data:
-            # Since there is so much data, we will just prompt the user for the start date of a
-            # "section" of data they wish to look at. The "section" of data will be 12 data entries.
-            # Subtract 1960 so we can get a valid index (0-50, inclusive for years between 1959 and
-            # 2010) to form a "section" of 12 data entries. This is because the implementation of
-            # load_data.calculate_error skips the first index.
-            section_start = int(input('What year of data would you like to start at (1960-2010, '
-                                      'inclusive)? ')) - 1960
-            climate_data = load.load_yearly_data(ANNUAL_CO2_FILE, ANNUAL_TEMP_ANOMALY_FILE)
-        else:
-            climate_data = load.load_monthly_data(MONTHLY_CO2_FILE, MONTHLY_TEMP_ANOMALY_FILE)
-            start_date = input('What year and month of data would you like to start at '
-                               '(1959-1 to 2020-1, inclusive)? ')
-            # Formula to calculate a valid index (0-732, inclusive) to form a "section" of 12 data
-            # entries
-            section_start = (int(start_date[0: 4]) - 1959) * 12 + (int(start_date[5:]) - 1)
-
+        climate_data, section_start = _prepare_climate_data(specifications, False)
         section_end = section_start + 12
 
-        sensitivity = specifications[1][1]
-        calc.update_data(climate_data, sensitivity)
-
-        if not is_yearly_data:
-            plot_compared_data(climate_data[section_start: section_end])
-        else:
-            plot_compared_data(climate_data[section_start: section_end])
+        plot_compared_data(climate_data[section_start: section_end])
 
     # Calling another function to plot the data
     plot_climate_data(climate_data)
 
+    # Plotly figures contain reference cycles (each trace refers back to its figure), so they are
+    # not freed when the plotting functions return. Collect them now that they have been shown,
+    # instead of letting every click's figures pile up until the garbage collector next runs.
+    gc.collect()
+
 
-def report_error_button_callback(specifications: tuple[str, list]) -> None:
+def report_error_button_callback(specifications: Specifications) -> None:
     """Analyze the accuracy of the model by visualizing the percent error given the current
     specifications.
-
-    Preconditions:
-        - len(specifications) != 0
-        - specifications[1] != []
     """
-    is_extrapolate = True if specifications[0] == 'On' else False
-    is_yearly_data = specifications[1][0]
-    if is_extrapolate:
+    if specifications.is_extrapolate:
         # Print to the console if the user is in "extrapolate data" mode
         print('Cannot report accuracy of the model for extrapolated data!')
         return
 
-    if is_yearly_data:
-        # Since there is so much data, we will just prompt the user for the start date of a
-        # "section" of data they wish to look at. The "section" of data will be 12 data entries.
-        # Subtract 1960 so we can get a valid index (0-50, inclusive for years between 1959 and
-        # 2009) to form a "section" of 12 data entries. This is because the implementation of
-        # load_data.calculate_error skips the first index.
-        section_start = int(input('What year of data would you like to start at (1960-2009, '
-                                  'inclusive)? ')) - 1960
-        climate_data = load.load_yearly_data(ANNUAL_CO2_FILE, ANNUAL_TEMP_ANOMALY_FILE)
-    else:
-        climate_data = load.load_monthly_data(MONTHLY_CO2_FILE, MONTHLY_TEMP_ANOMALY_FILE)
-        start_date = input('What year and month of data would you like to start at '
-                           '(1959-2 to 2020-1, inclusive)? ')
-        # Formula to calculate a valid index (0-731, inclusive) to form a "section" of 12 data
-        # entries
-        section_start = (int(start_date[0: 4]) - 1959) * 12 + (int(start_date[5:]) - 1) - 1
+    climate_data, section_start = _prepare_climate_data(specifications, True)
 
     # Must add 13 instead of 12 because the implementation of load_data.calculate_error skips the
     # first index
     section_end = section_start + 13
 
-    sensitivity = specifications[1][1]
-    calc.update_data(climate_data, sensitivity)
-
     reported_errors = calc.calculate_error(climate_data[section_start: section_end])
 
     # Calling another function to plot the data
@@ -234,36 +212,110 @@ def report_error_button_callback(specifications: tuple[str, list]) -> None:
     print(f'The percent error in this run was: '
           f'{calc.calculate_average_percent_error(climate_data)}')
 
+    # Free the figure that was just shown (see visualize_button_callback)
+    gc.collect()
+
+
+def _prepare_climate_data(specifications: Specifications, is_error_report: bool) \
+        -> tuple[np.ndarray, int]:
+    """Return a tuple containing the recorded climate data given by <specifications> and the index
+    where the "section" of data that the user wants to look at starts.
 
-def get_specifications(scale1: tk.Scale, scale2: tk.Scale, button: tk.Button, scale3: tk.Scale,
-                       scale4: tk.Scale) -> tuple[str, list]:
-    """Returns a list of specifications detailing what type and how the climate data should be
-    visualized.
+    The calculated values of the climate data are updated with the sensitivity in <specifications>.
+    <is_error_report> is whether the data is for report_error_button_callback rather than
+    visualize_button_callback.
 
-    <scale1>, <scale2>, <button>, <scale3>, and <scale4> correspond to <type_slider>,
-    <sensitivity_slider>, <extrapolate_button>, <extrapolate_input>, and <extrapolate_emissions>
-    from the run_visualization function.
+    Preconditions:
+        - not specifications.is_extrapolate
     """
-    specifications_so_far = []
-    yearly_data = True if int(scale1.get()) == 1 else False
-    sensitivity = float(scale2.get())
-    is_extrapolate = button['text']
+    section_start = _get_section_start(specifications.is_yearly_data, is_error_report)
+    climate_data = load_climate_data(specifications.is_yearly_data)
+    calc.update_data(climate_data, specifications.sensitivity)
+
+    return climate_data, section_start
+
 
-    if is_extrapolate == 'Off':
-        specifications_so_far.append(yearly_data)
-        specifications_so_far.append(sensitivity)
+def _get_section_start(is_yearly_data: bool, is_error_report: bool) -> int:
+    """Prompt the user for the start date of the "section" of data they wish to look at and return
+    the index where that section starts.
+
+    <is_error_report> is whether the section is for report_error_button_callback rather than
+    visualize_button_callback.
+    """
+    if is_yearly_data:
+        # Since there is so much data, we will just prompt the user for the start date of a
+        # "section" of data they wish to look at. The "section" of data will be 12 data entries.
+        # Subtract 1960 so we can get a valid index (0-50, inclusive, or 0-49 for an error report)
+        # to form a "section" of 12 data entries. This is because the implementation of
+        # load_data.calculate_error skips the first index.
+        last_year = 2009 if is_error_report else 2010
+        return int(input(f'What year of data would you like to start at (1960-{last_year}, '
+                         f'inclusive)? ')) - 1960
+    else:
+        # An error report cannot start at the first month, because the implementation of
+        # load_data.calculate_error skips the first index
+        first_month = 2 if is_error_report else 1
+        start_date = input(f'What year and month of data would you like to start at '
+                           f'(1959-{first_month} to 2020-1, inclusive)? ')
+        year, month = map(int, start_date.split('-'))
+        # Formula to calculate a valid index (0-732, inclusive, or 0-731 for an error report) to
+        # form a "section" of 12 data entries. An error report's section starts one entry earlier
+        # for the skipped first index.
+        return (year - 1959) * 12 + (month - 1) - (first_month - 1)
+
+
+def load_climate_data(is_yearly_data: bool) -> np.ndarray:
+    """Return the recorded yearly climate data if <is_yearly_data> is True, and the recorded monthly
+    climate data otherwise, as a structured array.
+
+    The csv files are only parsed the first time each type of data is requested. Every call returns
+    a new copy of the data, so mutating it (e.g. with calculations.update_data) does not affect
+    later calls.
+    """
+    return _load_cached_climate_data(is_yearly_data).copy()
+
+
+@lru_cache(maxsize=2)
+def _load_cached_climate_data(is_yearly_data: bool) -> np.ndarray:
+    """Return the recorded yearly or monthly climate data as a structured array.
+
+    The returned array is cached and shared between calls, so it must not be mutated.
+    """
+    if is_yearly_data:
+        return load.load_yearly_data_np(ANNUAL_CO2_FILE, ANNUAL_TEMP_ANOMALY_FILE)
     else:
-        num_entries = int(scale3.get())
-        emissions = float(scale4.get())
+        return load.load_monthly_data_np(MONTHLY_CO2_FILE, MONTHLY_TEMP_ANOMALY_FILE)
+
+
+def get_recorded_specifications(scale1: tk.Scale, scale2: tk.Scale) -> Specifications:
+    """Returns the specifications detailing how the recorded climate data should be visualized.
+
+    <scale1> and <scale2> correspond to <type_slider> and <sensitivity_slider> from the
+    run_visualization function.
+    """
+    yearly_data = int(scale1.get()) == 1
+    sensitivity = float(scale2.get())
+
+    return Specifications(False, yearly_data, sensitivity)
+
 
-        specifications_so_far.append(num_entries)
-        specifications_so_far.append(sensitivity)
-        specifications_so_far.append(emissions)
+def get_extrapolated_specifications(scale1: tk.Scale, scale2: tk.Scale, scale3: tk.Scale) \
+        -> Specifications:
+    """Returns the specifications detailing how the climate data should be extrapolated.
 
-    return is_extrapolate, specifications_so_far
+    <scale1>, <scale2>, and <scale3> correspond to <sensitivity_slider>, <extrapolate_input>, and
+    <extrapolate_emissions> from the run_visualization function. Extrapolated data is always
+    yearly data.
+    """
+    sensitivity = float(scale1.get())
+    num_entries = int(scale2.get())
+    emissions = float(scale3.get())
+
+    return Specifications(True, True, sensitivity, num_entries, emissions)
 
 
-def plot_climate_data(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) -> None:
+def plot_climate_data(metrics: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray]) \
+        -> None:
     """Plot the climate data in <metrics> as a time series.
 
     This function will plot both the recorded or calculated CO2 concentration and temperature
@@ -272,14 +324,16 @@ def plot_climate_data(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) -> No
     Preconditions:
         - metrics != []
     """
-    date_format = 'Year' if isinstance(metrics[0], YearlyMetrics) else 'Year, Month'
+    date_format = 'Year, Month' if load.is_monthly_data(metrics) else 'Year'
     x_data, y_data1, y_data2 = get_xy_data1(metrics)
 
     # The first graph
     fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Scatter(x=x_data, y=y_data1, name='CO2 Concentration Data'),
-                  secondary_y=False)
-    fig.add_trace(go.Scatter(x=x_data, y=y_data2, name='Temperature Data'), secondary_y=True)
+    # Scattergl traces are drawn with WebGL, which stays responsive on long time series. Both
+    # traces are added in a single call so the figure is only validated once.
+    fig.add_traces([go.Scattergl(x=x_data, y=y_data1, name='CO2 Concentration Data'),
+                    go.Scattergl(x=x_data, y=y_data2, name='Temperature Data')],
+                   secondary_ys=[False, True])
 
     fig.update_layout(title='Time series of CO2 Concentration and Temperature',
                       xaxis_title=date_format)
@@ -289,7 +343,8 @@ def plot_climate_data(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) -> No
     fig.show()
 
 
-def plot_compared_data(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) -> None:
+def plot_compared_data(metrics: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray]) \
+        -> None:
     """Plot the climate data in <metrics> as a time series.
 
     This function will plot the calculated and recorded temperature anomaly values.
@@ -298,7 +353,7 @@ def plot_compared_data(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) -> N
         - metrics != []
         - metrics is not a list of extrapolated data
     """
-    date_format = 'Year' if isinstance(metrics[0], YearlyMetrics) else 'Year, Month'
+    date_format = 'Year, Month' if load.is_monthly_data(metrics) else 'Year'
     x_data, y_data1, y_data2 = get_xy_data2(metrics)
 
     fig = go.Figure(data=[
@@ -312,64 +367,35 @@ def plot_compared_data(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) -> N
     fig.show()
 
 
-def get_xy_data1(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) \
-        -> tuple[list[str], list[float], list[float]]:
-    """Returns a tuple of three parallel lists. The first list is the year (or year and month)
-    corresponding to the climate data. The last two lists contains floats that correspond to the
+def get_xy_data1(metrics: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray]) \
+        -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Returns a tuple of a list and two arrays, all parallel. The list is the year (or year and
+    month) corresponding to the climate data. The two arrays contain floats that correspond to the
     recorded CO2 concentration and the temperature.
     """
-    dates_so_far = []
-    concentrations_so_far = []
-    temperatures_so_far = []
-
-    for entry in metrics:
-        if isinstance(entry, YearlyMetrics):
-            current_date = str(entry.year)
-        else:
-            current_date = f'{entry.year}, {entry.month}'
-        current_concentration = entry.co2
-        current_temperature = entry.temp
+    return load.get_date_labels(metrics), load.get_column(metrics, 'co2'), \
+        load.get_column(metrics, 'temp')
 
-        dates_so_far.append(current_date)
-        concentrations_so_far.append(current_concentration)
-        temperatures_so_far.append(current_temperature)
 
-    return dates_so_far, concentrations_so_far, temperatures_so_far
-
-
-def get_xy_data2(metrics: list[Union[YearlyMetrics, MonthlyMetrics]]) \
-        -> tuple[list[str], list[float], list[float]]:
-    """Returns a tuple of three parallel lists. The first list is the year (or year and month)
-    corresponding to the climate data. The last two lists contains floats that correspond to the
+def get_xy_data2(metrics: Union[list[Union[YearlyMetrics, MonthlyMetrics]], np.ndarray]) \
+        -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Returns a tuple of a list and two arrays, all parallel. The list is the year (or year and
+    month) corresponding to the climate data. The two arrays contain floats that correspond to the
     calculated and recorded temperatures.
 
     Preconditions:
         - the data in metrics is not extrapolated data
     """
-    dates_so_far = []
-    temp_anomalies_so_far = []
-    recorded_temp_anomalies_so_far = []
-
-    for entry in metrics:
-        if isinstance(entry, YearlyMetrics):
-            current_date = str(entry.year)
-        else:
-            current_date = f'{entry.year}, {entry.month}'
-        calculated_temp_anomaly = entry.calculated_temp_anomaly
-        recorded_temp_anomaly = entry.temp_anomaly
-
-        dates_so_far.append(current_date)
-        temp_anomalies_so_far.append(calculated_temp_anomaly)
-        recorded_temp_anomalies_so_far.append(recorded_temp_anomaly)
-
-    return dates_so_far, temp_anomalies_so_far, recorded_temp_anomalies_so_far
+    # The first calculated temperature anomaly is None for a list of metrics, so it becomes NaN
+    return load.get_date_labels(metrics), load.get_column(metrics, 'calculated_temp_anomaly'), \
+        load.get_column(metrics, 'temp_anomaly')
 
 
 def plot_reported_errors(errors: dict[str, float]) -> None:
     """Plot the percent errors in <errors> as a time series.
     """
-    x_data = list(errors.keys())
-    y_data = list(errors.values())
+    x_data = list(errors)
+    y_data = np.fromiter(errors.values(), dtype=np.float64, count=len(errors))
 
     fig = go.Figure([go.Bar(name='Percent Error', x=x_data, y=y_data)])
     fig.update_layout(title='Time series of percentage error in temperature anomalies',
@@ -380,19 +406,28 @@ def plot_reported_errors(errors: dict[str, float]) -> None:
 
 
 if __name__ == '__main__':
+    import os
+    import sys
     import doctest
-    doctest.testmod(verbose=True)
-
-    import python_ta
-    import python_ta.contracts
-
-    python_ta.contracts.DEBUG_CONTRACTS = False
-    python_ta.contracts.check_all_contracts()
 
-    python_ta.check_all(config={
-        'extra-imports': ['plotly.graph_objects', 'tkinter', 'load_data', 'calculations',
-                          'plotly.subplots', 'os'],
-        'allowed-io': ['visualize_button_callback', 'report_error_button_callback'],
-        'max-line-length': 100,
-        'disable': ['R1705', 'C0200']
-    })
+    # Running with python -O skips the doctests
+    if not sys.flags.optimize:
+        doctest.testmod(verbose=True)
+
+    # python_ta is slow to import and check, so it only runs when the RUN_PYTA environment
+    # variable is set
+    if os.environ.get('RUN_PYTA'):
+        import python_ta
+        import python_ta.contracts
+
+        python_ta.contracts.DEBUG_CONTRACTS = False
+        python_ta.contracts.check_all_contracts()
+
+        python_ta.check_all(config={
+            'extra-imports': ['sys', 'plotly.graph_objects', 'tkinter', 'load_data', 'calculations',
+                              'plotly.subplots', 'os', 'numpy', 'functools',
+                              'NamedTuple', 'gc'],
+            'allowed-io': ['report_error_button_callback', '_get_section_start'],
+            'max-line-length': 100,
+            'disable': ['R1705', 'C0200']
+        })